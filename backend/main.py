@@ -4,19 +4,30 @@ from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 import asyncio
 import os
-import json
+import threading
+import orjson
 from sse_starlette.sse import EventSourceResponse
 from services.scraper_service import GoogleMapsScraperService
-import pandas as pd
-from fastapi.responses import FileResponse, Response
-import io
+from services.geocode_cache import geocode_cached
+from openpyxl import Workbook
+import tempfile
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
 from dotenv import load_dotenv
 from routers import lists
 
 # Load env variables from parent directory if needed
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
-app = FastAPI(title="Google Maps Scraper API")
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, which encodes large list payloads
+    several times faster than the stdlib json encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(title="Google Maps Scraper API", default_response_class=ORJSONResponse)
 
 app.include_router(lists.router)
 
@@ -82,68 +93,91 @@ async def scrape_locations(request: ScrapeRequest):
     scraper = GoogleMapsScraperService(api_key=api_key)
 
     async def event_generator():
-        loop = asyncio.get_event_loop()
-        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        # Bounded so a slow client applies backpressure to the scraper thread
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+        stopped = threading.Event()
         _SENTINEL = object()
 
+        def _put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
         def _run_sync():
             try:
                 for event in scraper.run_scraping(
                     request.city, request.radius, request.keywords,
                     request.list_name, request.grid_step
                 ):
-                    loop.call_soon_threadsafe(queue.put_nowait, event)
+                    if stopped.is_set():
+                        break  # Client went away, stop scraping
+                    _put(event)
             except Exception as exc:
-                loop.call_soon_threadsafe(
-                    queue.put_nowait,
-                    {"type": "error", "message": f"ERRORE CRITICO: {exc}"}
-                )
+                if not stopped.is_set():
+                    _put({"type": "error", "message": f"ERRORE CRITICO: {exc}"})
             finally:
-                loop.call_soon_threadsafe(queue.put_nowait, _SENTINEL)
-
-        loop.run_in_executor(None, _run_sync)
-
-        while True:
-            event = await queue.get()
-            if event is _SENTINEL:
-                break
-            yield {"data": json.dumps(event)}
-
-    return EventSourceResponse(event_generator())
+                if not stopped.is_set():
+                    _put(_SENTINEL)
+
+        threading.Thread(target=_run_sync, daemon=True).start()
+
+        try:
+            while (event := await queue.get()) is not _SENTINEL:
+                # orjson encodes in C, keeping per-event cost low on long scrapes
+                yield {"data": orjson.dumps(event, default=str).decode()}
+        finally:
+            # On disconnect, free any put the producer is blocked on so the
+            # thread can notice `stopped` and exit
+            stopped.set()
+            while not queue.empty():
+                queue.get_nowait()
+
+    # Explicit no-cache/no-buffering so reverse proxies flush every event
+    return EventSourceResponse(
+        event_generator(),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/api/download")
-async def download_excel(data: List[DownloadRow]):
+def download_excel(data: List[DownloadRow]):
     if len(data) > 50000:
         raise HTTPException(status_code=400, detail="Troppi dati: massimo 50.000 righe.")
+    # Sync endpoint: FastAPI runs it in the threadpool, so building the
+    # workbook doesn't block the event loop. The file is streamed from disk
+    # and removed once sent, instead of being held in memory as bytes.
+    fd, tmp_path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
     try:
-        df = pd.DataFrame([row.model_dump(by_alias=True) for row in data])
-        
-        # Create an in-memory buffer
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False)
-        
-        buffer.seek(0)
-        
-        headers = {
-            'Content-Disposition': 'attachment; filename="risultati_scraper.xlsx"'
-        }
-        return Response(content=buffer.getvalue(), media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers=headers)
+        rows = [row.model_dump(by_alias=True) for row in data]
+        # Ordered union of keys: extra fields are allowed on DownloadRow
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet1')
+        ws.append(columns)
+        for row in rows:
+            ws.append([row.get(col) for col in columns])
+        wb.save(tmp_path)
     except Exception as e:
+        os.remove(tmp_path)
         raise HTTPException(status_code=500, detail=f"Failed to generate Excel: {str(e)}")
 
+    return FileResponse(
+        path=tmp_path,
+        filename="risultati_scraper.xlsx",
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        background=BackgroundTask(os.remove, tmp_path)
+    )
+
 @app.get("/api/geocode")
-async def geocode_location(q: str):
+def geocode_location(q: str):
     api_key = os.getenv("GOOGLE_MAPS_API_KEY")
     if not api_key:
         raise HTTPException(status_code=500, detail="API key mancante")
     import googlemaps
     gmaps = googlemaps.Client(key=api_key)
-    result = gmaps.geocode(q)
-    if not result:
+    coords = geocode_cached(gmaps, q)
+    if not coords:
         raise HTTPException(status_code=404, detail="Località non trovata")
-    loc = result[0]['geometry']['location']
-    return {"lat": loc['lat'], "lng": loc['lng']}
+    return {"lat": coords[0], "lng": coords[1]}
 
 @app.get("/health")
 def read_health():
@@ -1,42 +1,72 @@
 import os
 import re
-import glob
+import json
+import atexit
+import logging
 import shutil
 import tempfile
 import threading
-from collections import defaultdict
+from collections import OrderedDict
+from functools import lru_cache
 import pandas as pd
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from openpyxl import load_workbook
+from typing import List
+from pydantic import BaseModel, Field
+from openpyxl import Workbook, load_workbook
 from starlette.background import BackgroundTask
 
 router = APIRouter(prefix="/api/lists", tags=["lists"])
 
+logger = logging.getLogger(__name__)
+
 LISTS_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "data", "lists"))
 
 # Ensure the directory exists
 os.makedirs(LISTS_DIR, exist_ok=True)
 
 
+@lru_cache(maxsize=256)
+def _resolve_in_lists_dir(clean: str) -> str:
+    """realpath of a bare file name inside LISTS_DIR, memoized per name."""
+    return os.path.realpath(os.path.join(LISTS_DIR, clean))
+
+
 def _safe_filepath(filename: str) -> str:
     """Resolve filename inside LISTS_DIR, rejecting any path traversal attempt."""
     # Strip directory components — only the basename matters
     clean = os.path.basename(filename)
-    if not clean or clean != filename:
+    if not clean or clean != filename or not clean.endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Nome file non valido")
-    filepath = os.path.realpath(os.path.join(LISTS_DIR, clean))
+    filepath = _resolve_in_lists_dir(clean)
     if not filepath.startswith(LISTS_DIR + os.sep):
         raise HTTPException(status_code=400, detail="Nome file non valido")
     return filepath
 
-# Per-file locks to prevent concurrent read-modify-write corruption
-_file_locks = defaultdict(threading.Lock)
+
+def _existing_filepath(filename: str) -> str:
+    """Like _safe_filepath, but also raises 404 if the list doesn't exist."""
+    filepath = _safe_filepath(filename)
+    if not os.path.exists(filepath):
+        raise HTTPException(status_code=404, detail="Lista non trovata")
+    return filepath
+
+# Per-file locks to prevent concurrent read-modify-write corruption.
+# _locks_guard makes lookup-or-create atomic so two threads can never end up
+# holding different Lock objects for the same file.
+_locks_guard = threading.Lock()
+_file_locks: dict[str, threading.Lock] = {}
 
 def _get_file_lock(filepath: str) -> threading.Lock:
     """Returns a lock specific to the given file path."""
-    return _file_locks[os.path.normpath(filepath)]
+    key = os.path.normpath(filepath)
+    with _locks_guard:
+        return _file_locks.setdefault(key, threading.Lock())
+
+def _drop_file_lock(filepath: str):
+    """Forgets the lock of a deleted file so the registry doesn't grow forever."""
+    with _locks_guard:
+        _file_locks.pop(os.path.normpath(filepath), None)
 
 def _sanitize_filename(name: str) -> str:
     """Removes dangerous characters from a list name. Returns the sanitized name (without .xlsx)."""
@@ -55,15 +85,36 @@ def _sanitize_filename(name: str) -> str:
     return name
 
 
+# Standard columns that the scraper outputs
+# We include Place_ID for deduplication
+LIST_COLUMNS = [
+    'Place_ID', 'Nome', 'Indirizzo', 'Telefono', 'Sito Web', 'Rating',
+    'Categorie', 'Keyword Ricerca', 'Data Estrazione', 'Hide', 'Call', 'Interested', 'Note'
+]
+
+
 class CreateListRequest(BaseModel):
     name: str
 
+# (directory st_mtime_ns, file names) of the last listing. Creating, deleting
+# or renaming a file bumps the directory mtime, which invalidates it.
+_listing_cache = None
+
 @router.get("/")
 def get_lists():
     """Returns a list of all available Excel files in the lists directory."""
-    files = glob.glob(os.path.join(LISTS_DIR, "*.xlsx"))
-    # Return just the filenames without path
-    file_names = [os.path.basename(f) for f in files]
+    global _listing_cache
+    mtime_ns = os.stat(LISTS_DIR).st_mtime_ns
+    cached = _listing_cache
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    # scandir yields names without a stat call per entry
+    with os.scandir(LISTS_DIR) as entries:
+        file_names = [
+            e.name for e in entries
+            if e.name.endswith(".xlsx") and not e.name.startswith(".")
+        ]
+    _listing_cache = (mtime_ns, file_names)
     return file_names
 
 @router.post("/")
@@ -80,47 +131,116 @@ def create_list(request: CreateListRequest):
         raise HTTPException(status_code=409, detail=f"La lista '{filename}' esiste già")
         
     try:
-        # Standard columns that the scraper outputs
-        # We include Place_ID for deduplication
-        df = pd.DataFrame(columns=[
-            'Place_ID', 'Nome', 'Indirizzo', 'Telefono', 'Sito Web', 'Rating',
-            'Categorie', 'Keyword Ricerca', 'Data Estrazione', 'Hide', 'Call', 'Interested', 'Note'
-        ])
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        # Header-only workbook: no need to go through a DataFrame
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet1')
+        ws.append(LIST_COLUMNS)
+        wb.save(filepath)
         return {"message": "Lista creata con successo", "filename": filename}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore durante la creazione del file: {str(e)}")
 
+# Parsed lists kept in memory: normpath -> (st_mtime_ns, st_size, records).
+# The xlsx stays the canonical store; an entry is only served while the file's
+# mtime and size still match, and writes store a patched copy of the entry
+# (see _update_cells) so the next read doesn't have to re-parse the workbook.
+# Cached lists and their records are handed out to responses as-is, so they
+# are never mutated: a change replaces the affected records and the list.
+_LIST_CACHE_SIZE = 64
+_list_cache: OrderedDict = OrderedDict()
+_list_cache_guard = threading.Lock()
+
+
+def _stat_key(filepath: str) -> tuple:
+    st = os.stat(filepath)
+    return st.st_mtime_ns, st.st_size
+
+
+def _store_cached_list(filepath: str, records: list, stat_key: tuple = None):
+    """Caches records as the content of filepath, as of stat_key
+    (default: the file as it is on disk right now)."""
+    key = os.path.normpath(filepath)
+    mtime_ns, size = stat_key or _stat_key(key)
+    with _list_cache_guard:
+        _list_cache[key] = (mtime_ns, size, records)
+        _list_cache.move_to_end(key)
+        while len(_list_cache) > _LIST_CACHE_SIZE:
+            _list_cache.popitem(last=False)
+
+
+def _pop_cached_list(filepath: str):
+    """Removes and returns the cached records of filepath, or None if there
+    are none or they no longer match the file on disk."""
+    key = os.path.normpath(filepath)
+    with _list_cache_guard:
+        hit = _list_cache.pop(key, None)
+    if hit is None or hit[:2] != _stat_key(key):
+        return None
+    return hit[2]
+
+
+def _invalidate_cached_list(filepath: str):
+    with _list_cache_guard:
+        _list_cache.pop(os.path.normpath(filepath), None)
+
+
+def _load_list(filepath: str) -> list:
+    """Returns the JSON-ready records of a list, parsing it only if the file
+    changed since it was last cached."""
+    key = os.path.normpath(filepath)
+    mtime_ns, size = _stat_key(key)
+    with _list_cache_guard:
+        hit = _list_cache.get(key)
+        if hit is not None and hit[:2] == (mtime_ns, size):
+            _list_cache.move_to_end(key)
+            return hit[2]
+
+    records = _parse_list(key)
+    # Keyed on the stat taken *before* parsing: if the file changed meanwhile,
+    # the entry is simply stale and the next read re-parses it.
+    _store_cached_list(key, records, (mtime_ns, size))
+    return records
+
+
+# pandas' openpyxl reader already opens workbooks with read_only=True,
+# data_only=True and keep_links=False. Declaring Place_ID as text skips its
+# type inference and keeps ids as strings, matching the str() row lookups.
+# The flag columns are left to inference: a stray non-boolean cell typed in
+# Excel would make a 'boolean' dtype fail the whole read.
+READ_DTYPES = {'Place_ID': str}
+
+_BOOL_COLUMNS = ['Hide', 'Call', 'Interested']
+_LIST_DEFAULTS = {'Hide': False, 'Call': False, 'Interested': False, 'Note': ''}
+
+
+def _parse_list(filepath: str) -> list:
+    """Parses the main sheet into JSON-ready records."""
+    df = pd.read_excel(filepath, dtype=READ_DTYPES)
+
+    # Ensure new columns exist for old files
+    for col, default in _LIST_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+
+    # Keep the flags boolean (NaN -> False) with a single block-wise cast,
+    # before the remaining NaN/NaT become empty strings for JSON
+    df[_BOOL_COLUMNS] = df[_BOOL_COLUMNS].fillna(False).astype(bool)
+
+    df_clean = df.fillna('')
+    # Column-wise tolist() + zip is much cheaper than to_dict('records'),
+    # which boxes every cell through a per-row Python loop
+    columns = df_clean.columns.tolist()
+    arrays = [df_clean[col].tolist() for col in columns]
+    return [dict(zip(columns, row)) for row in zip(*arrays)]
+
 @router.get("/{filename}")
 def get_list_content(filename: str):
     """Returns the content of a specific Excel list as a JSON array."""
-    filepath = _safe_filepath(filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Lista non trovata")
+    filepath = _existing_filepath(filename)
         
     try:
-        df = pd.read_excel(filepath)
-        
-        # Ensure new columns exist for old files
-        if 'Hide' not in df.columns:
-            df['Hide'] = False
-        if 'Call' not in df.columns:
-            df['Call'] = False
-        if 'Interested' not in df.columns:
-            df['Interested'] = False
-        if 'Note' not in df.columns:
-            df['Note'] = ''
-
-        # Ensure NaN/NaT are converted to empty strings before sending to JSON
-        # For booleans that were True/False, they might become empty strings if not careful, 
-        # so let's make sure Hide/Call stay boolean
-        df['Hide'] = df['Hide'].fillna(False).astype(bool)
-        df['Call'] = df['Call'].fillna(False).astype(bool)
-        df['Interested'] = df['Interested'].fillna(False).astype(bool)
-        
-        df_clean = df.fillna('')
-        data = df_clean.to_dict(orient='records')
+        _flush_pending_writes(filepath)
+        data = _load_list(filepath)
         return {"filename": filename, "data": data, "total": len(data)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore durante la lettura del file: {str(e)}")
@@ -128,52 +248,30 @@ def get_list_content(filename: str):
 @router.delete("/{filename}")
 def delete_list(filename: str):
     """Deletes a specific Excel list."""
-    filepath = _safe_filepath(filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Lista non trovata")
+    filepath = _existing_filepath(filename)
         
     try:
-        os.remove(filepath)
+        _take_pending_writes(filepath)  # Edits to a deleted list are moot
+        with _get_file_lock(filepath):
+            os.remove(filepath)
+            if os.path.exists(_index_path(filepath)):
+                os.remove(_index_path(filepath))
+        _invalidate_cached_list(filepath)
+        _forget_ricerche(filepath)
+        _drop_file_lock(filepath)
         return {"message": f"Lista '{filename}' eliminata con successo"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore durante l'eliminazione del file: {str(e)}")
 
-def _save_preserving_ricerche(filepath: str, df: pd.DataFrame):
-    """Saves df to the main sheet of the Excel file, preserving the _ricerche sheet.
-
-    Uses atomic write: writes to a temp file first, then replaces the original.
-    The caller MUST hold the file lock for filepath.
-    """
-    # Backup _ricerche sheet if it exists
-    searches_headers = []
-    searches_rows = []
-    try:
-        searches_df = pd.read_excel(filepath, sheet_name='_ricerche')
-        searches_headers = searches_df.columns.tolist()
-        searches_rows = searches_df.values.tolist()
-    except Exception:
-        pass  # Sheet doesn't exist yet
-
-    # Write to a temporary file first (atomic write pattern)
+def _save_workbook_atomic(wb, filepath: str):
+    """Saves an openpyxl workbook over filepath via a temp file + rename.
+    The caller MUST hold the file lock for filepath."""
     dir_name = os.path.dirname(filepath)
     fd, tmp_path = tempfile.mkstemp(suffix='.xlsx', dir=dir_name)
     os.close(fd)
 
     try:
-        # Write main sheet
-        df.to_excel(tmp_path, index=False, engine='openpyxl')
-
-        # Add _ricerche sheet if it existed
-        if searches_headers:
-            wb = load_workbook(tmp_path)
-            ws = wb.create_sheet('_ricerche')
-            ws.append(searches_headers)
-            for row in searches_rows:
-                ws.append(row)
-            wb.save(tmp_path)
-
-        # Atomic replace: rename temp file over original
+        wb.save(tmp_path)
         shutil.move(tmp_path, filepath)
     except Exception:
         # Clean up temp file on failure - original file remains intact
@@ -182,28 +280,479 @@ def _save_preserving_ricerche(filepath: str, df: pd.DataFrame):
         raise
 
 
+def _dataframe_rows(df: pd.DataFrame):
+    """Yields the rows of df as lists, with NaN/NaT turned into empty cells."""
+    clean = df.astype(object).where(df.notna(), None)
+    for row in clean.itertuples(index=False, name=None):
+        yield list(row)
+
+
+# _ricerche sheets already read: normpath -> (st_mtime_ns, st_size, headers, rows).
+# The sheet only changes when a scrape appends a search, yet the history
+# endpoint and every download read it; this spares re-parsing it each time.
+_ricerche_cache: dict[str, tuple] = {}
+_ricerche_guard = threading.Lock()
+
+
+def _cached_ricerche(filepath: str):
+    """Returns (headers, rows) if cached for the file as it is on disk now."""
+    key = os.path.normpath(filepath)
+    with _ricerche_guard:
+        hit = _ricerche_cache.get(key)
+    if hit is None or hit[:2] != _stat_key(key):
+        return None
+    return hit[2], hit[3]
+
+
+def _remember_ricerche(filepath: str, headers: list, rows: list):
+    """Caches (headers, rows) as the _ricerche content of filepath as it is on
+    disk right now. Call right after writing the file, under its lock."""
+    key = os.path.normpath(filepath)
+    mtime_ns, size = _stat_key(key)
+    with _ricerche_guard:
+        _ricerche_cache[key] = (mtime_ns, size, headers, rows)
+
+
+def _forget_ricerche(filepath: str):
+    with _ricerche_guard:
+        _ricerche_cache.pop(os.path.normpath(filepath), None)
+
+
+def _read_ricerche(filepath: str) -> tuple:
+    """Reads the _ricerche sheet as (headers, rows) of plain Python lists.
+
+    Served from memory while the file is unchanged, otherwise streamed in
+    read-only mode; returns ([], []) if the sheet doesn't exist yet. Blank
+    rows are skipped.
+    """
+    hit = _cached_ricerche(filepath)
+    if hit is not None:
+        return hit
+    mtime_ns, size = _stat_key(filepath)
+    headers, rows = _parse_ricerche(filepath)
+    with _ricerche_guard:
+        _ricerche_cache[os.path.normpath(filepath)] = (mtime_ns, size, headers, rows)
+    return headers, rows
+
+
+def _parse_ricerche(filepath: str) -> tuple:
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        if '_ricerche' not in wb.sheetnames:
+            return [], []
+        rows = wb['_ricerche'].iter_rows(values_only=True)
+        headers = list(next(rows, ()))
+        while headers and headers[-1] is None:
+            headers.pop()
+        width = len(headers)
+        searches_rows = [
+            list(row[:width]) for row in rows
+            if any(v is not None for v in row[:width])
+        ]
+        return headers, searches_rows
+    finally:
+        wb.close()
+
+
+def _build_list_workbook(df: pd.DataFrame, searches_headers: list, searches_rows: list) -> Workbook:
+    """Builds a write-only workbook holding df as the main sheet and, if
+    present, the _ricerche rows, so both are serialized in a single save."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(df.columns.tolist())
+    for row in _dataframe_rows(df):
+        ws.append(row)
+
+    # Add _ricerche sheet if it existed
+    if searches_headers:
+        ws = wb.create_sheet('_ricerche')
+        ws.append(searches_headers)
+        for row in searches_rows:
+            ws.append(row)
+    return wb
+
+
 def _save_preserving_ricerche_into(source_filepath: str, df: pd.DataFrame, dest_path: str):
     """Writes df to the main sheet of dest_path, copying the _ricerche sheet
     from source_filepath. Does not modify source_filepath.
     The caller MUST hold the file lock for source_filepath."""
-    searches_headers = []
-    searches_rows = []
+    searches_headers, searches_rows = _read_ricerche(source_filepath)
+
+    wb = _build_list_workbook(df, searches_headers, searches_rows)
+    wb.save(dest_path)
+
+
+def _index_path(filepath: str) -> str:
+    """Path of the Place_ID -> row number sidecar of a list."""
+    return filepath + '.idx.json'
+
+
+def _read_place_index(filepath: str) -> dict:
+    """Loads the Place_ID sidecar of a list; {} if missing or unreadable."""
+    try:
+        with open(_index_path(filepath), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_place_index(filepath: str, index: dict):
+    """Atomically writes the Place_ID -> 1-based row number sidecar.
+    The caller MUST hold the file lock for filepath."""
+    dir_name = os.path.dirname(filepath)
+    fd, tmp_path = tempfile.mkstemp(suffix='.idx.json', dir=dir_name)
     try:
-        searches_df = pd.read_excel(source_filepath, sheet_name='_ricerche')
-        searches_headers = searches_df.columns.tolist()
-        searches_rows = searches_df.values.tolist()
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, _index_path(filepath))
     except Exception:
-        pass  # Sheet doesn't exist
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
-    df.to_excel(dest_path, index=False, engine='openpyxl')
 
-    if searches_headers:
-        wb = load_workbook(dest_path)
-        ws = wb.create_sheet('_ricerche')
-        ws.append(searches_headers)
-        for row in searches_rows:
+def _place_index_from_ids(place_ids) -> dict:
+    """Maps each Place_ID to its sheet row (data starts on row 2); the first
+    occurrence wins, as in the row lookups."""
+    index = {}
+    for row_num, pid in enumerate(place_ids, start=2):
+        if pid is not None and pid == pid:  # skip empty cells and NaN
+            index.setdefault(str(pid), row_num)
+    return index
+
+
+def _update_cells(filepath: str, edits) -> list:
+    """Applies edits, an iterable of (place_id, col_name, value), to the main
+    sheet with a single workbook load and save. Returns the place_ids that
+    weren't found (their edits are skipped).
+
+    Rows come from the Place_ID sidecar index; each is verified against the
+    sheet and, if the index is missing or stale (e.g. rows appended by a
+    scrape), it is rebuilt once from a single column scan. Only the target
+    cells are written back, other sheets (e.g. _ricerche) are left as-is.
+    The caller MUST hold the file lock for filepath.
+    """
+    wb = load_workbook(filepath)
+    ws = wb.worksheets[0]
+    headers = [cell.value for cell in ws[1]]
+    while headers and headers[-1] is None:
+        headers.pop()
+
+    if 'Place_ID' not in headers:
+        raise HTTPException(status_code=500, detail="Il file non contiene una colonna Place_ID.")
+    id_col = headers.index('Place_ID') + 1
+
+    index = _read_place_index(filepath)
+    rebuilt = False
+    applied = []
+    missing = []
+    for place_id, col_name, value in edits:
+        row_num = index.get(place_id)
+        if (row_num is None or not 2 <= row_num <= ws.max_row
+                or str(ws.cell(row=row_num, column=id_col).value) != place_id):
+            if not rebuilt:
+                index = _place_index_from_ids(
+                    pid for (pid,) in ws.iter_rows(min_row=2, min_col=id_col, max_col=id_col, values_only=True)
+                )
+                _write_place_index(filepath, index)
+                rebuilt = True
+            row_num = index.get(place_id)
+            if row_num is None:
+                missing.append(place_id)
+                continue
+
+        if col_name in headers:
+            col_num = headers.index(col_name) + 1
+        else:
+            # Old files may lack the column: add it to the header row
+            headers.append(col_name)
+            col_num = len(headers)
+            ws.cell(row=1, column=col_num, value=col_name)
+        ws.cell(row=row_num, column=col_num, value=value)
+        applied.append((place_id, col_name, value))
+
+    if not applied:
+        return missing
+
+    cached = _pop_cached_list(filepath)
+    ricerche = _cached_ricerche(filepath)
+    _save_workbook_atomic(wb, filepath)
+    if ricerche is not None:
+        # Only main sheet cells changed: the _ricerche copy is still valid
+        _remember_ricerche(filepath, *ricerche)
+    if cached is not None:
+        # Apply the same edits to a copy of the parsed list instead of
+        # re-parsing later; only the edited records are copied.
+        # Place_ID is read as text (READ_DTYPES), so records compare directly
+        # without a str() per row, and the scan stops at the last edited row.
+        wanted = {}
+        for place_id, col_name, value in applied:
+            wanted.setdefault(place_id, []).append((col_name, value))
+        patched = list(cached)
+        for i, record in enumerate(cached):
+            row_edits = wanted.pop(record.get('Place_ID'), None)
+            if row_edits:
+                record = dict(record)
+                for col_name, value in row_edits:
+                    record[col_name] = value
+                patched[i] = record
+                if not wanted:
+                    break
+        _store_cached_list(filepath, patched)
+    return missing
+
+
+# From this size on, scrape appends stream the list through a read-only
+# reader into a write-only workbook instead of loading its full cell graph
+# (a few tens of thousands of rows). Smaller lists are edited in place,
+# keeping their formatting.
+STREAMING_APPEND_MIN_BYTES = 2 * 1024 * 1024
+
+_RICERCHE_HEADERS = ['Data', 'Lat', 'Lng', 'Raggio', 'Grid Step', 'Keywords']
+
+
+def _sheet_rows(headers: list, columns: list, rows: list) -> list:
+    """Extends headers in place with any of columns it lacks and returns
+    rows laid out in header order."""
+    for col_name in columns:
+        if col_name not in headers:
+            headers.append(col_name)
+
+    # Sheet position of each incoming column, resolved once for all rows
+    positions = [headers.index(col_name) for col_name in columns]
+    if positions == list(range(len(columns))):
+        return rows
+    laid_out = []
+    for row in rows:
+        cells = [None] * len(headers)
+        for pos, value in zip(positions, row):
+            cells[pos] = value
+        laid_out.append(cells)
+    return laid_out
+
+
+def _append_rows_in_place(filepath: str, columns: list, rows: list, search_row: list) -> tuple:
+    """Loads the workbook, appends to it and saves it back.
+    Returns (headers, first appended row number)."""
+    wb = load_workbook(filepath)
+    ws = wb.worksheets[0]
+    headers = [cell.value for cell in ws[1]]
+    while headers and headers[-1] is None:
+        headers.pop()
+    if not headers:
+        headers = list(LIST_COLUMNS)
+
+    first_row = ws.max_row + 1
+    new_rows = _sheet_rows(headers, columns, rows)
+    # Old files may lack some columns: (re)write the header row
+    for col_num, col_name in enumerate(headers, start=1):
+        if ws.cell(row=1, column=col_num).value != col_name:
+            ws.cell(row=1, column=col_num, value=col_name)
+    for row in new_rows:
+        ws.append(row)
+
+    if '_ricerche' in wb.sheetnames:
+        ws_searches = wb['_ricerche']
+    else:
+        ws_searches = wb.create_sheet('_ricerche')
+        ws_searches.append(_RICERCHE_HEADERS)
+    ws_searches.append(search_row)
+
+    _save_workbook_atomic(wb, filepath)
+    return headers, first_row
+
+
+def _append_rows_streaming(filepath: str, columns: list, rows: list, search_row: list) -> tuple:
+    """Copies the list row by row from a read-only reader into a write-only
+    workbook, adding the new rows and search entry on the way, so memory
+    stays flat whatever the list size. Cell values of every sheet are kept;
+    formatting is not, as with the other full rewrites of a list.
+    Returns (headers, first appended row number)."""
+    src = load_workbook(filepath, read_only=True)
+    try:
+        wb = Workbook(write_only=True)
+        src_main = src.worksheets[0]
+        source_rows = src_main.iter_rows(values_only=True)
+        headers = list(next(source_rows, ()))
+        while headers and headers[-1] is None:
+            headers.pop()
+        if not headers:
+            headers = list(LIST_COLUMNS)
+        new_rows = _sheet_rows(headers, columns, rows)
+
+        ws = wb.create_sheet(src_main.title)
+        ws.append(headers)
+        first_row = 2
+        for row in source_rows:
             ws.append(row)
-        wb.save(dest_path)
+            first_row += 1
+        for row in new_rows:
+            ws.append(row)
+
+        for src_ws in src.worksheets[1:]:
+            ws = wb.create_sheet(src_ws.title)
+            for row in src_ws.iter_rows(values_only=True):
+                ws.append(row)
+            if src_ws.title == '_ricerche':
+                ws.append(search_row)
+        if '_ricerche' not in src.sheetnames:
+            ws = wb.create_sheet('_ricerche')
+            ws.append(_RICERCHE_HEADERS)
+            ws.append(search_row)
+    finally:
+        src.close()
+
+    _save_workbook_atomic(wb, filepath)
+    return headers, first_row
+
+
+def _append_rows(filepath: str, columns: list, rows, search_row: list) -> list:
+    """Appends rows (sequences of values in `columns` order) to the main sheet
+    and search_row to the _ricerche sheet in a single save, without going
+    through pandas. Returns the list's JSON-ready records after the append.
+    The caller MUST hold the file lock for filepath."""
+    cached = _pop_cached_list(filepath)
+    ricerche = _cached_ricerche(filepath)
+    rows = [list(row) for row in rows]
+    id_pos = columns.index('Place_ID') if 'Place_ID' in columns else None
+
+    if os.path.getsize(filepath) >= STREAMING_APPEND_MIN_BYTES:
+        headers, first_row = _append_rows_streaming(filepath, columns, rows, search_row)
+    else:
+        headers, first_row = _append_rows_in_place(filepath, columns, rows, search_row)
+
+    if ricerche is not None:
+        searches_headers, searches_rows = ricerche
+        if not searches_headers:
+            # The sheet was just created
+            searches_headers = list(_RICERCHE_HEADERS)
+        _remember_ricerche(filepath, searches_headers, searches_rows + [list(search_row)])
+
+    if id_pos is not None:
+        index = _read_place_index(filepath)
+        for row_num, row in enumerate(rows, start=first_row):
+            place_id = row[id_pos]
+            if place_id:
+                index.setdefault(str(place_id), row_num)
+        _write_place_index(filepath, index)
+
+    if cached is None:
+        return _load_list(filepath)
+
+    # Extend a copy of the parsed list the way _parse_list would have read the new rows
+    record_columns = list(cached[0]) if cached else headers + [c for c in _LIST_DEFAULTS if c not in headers]
+    added_columns = [col_name for col_name in headers if col_name not in record_columns]
+    if added_columns:
+        record_columns += added_columns
+        blanks = dict.fromkeys(added_columns, '')
+        records = [{**existing, **blanks} for existing in cached]
+    else:
+        records = list(cached)
+    for row in rows:
+        values = dict(zip(columns, row))
+        record = {}
+        for col_name in record_columns:
+            value = values.get(col_name)
+            if value is None:
+                value = _LIST_DEFAULTS.get(col_name, '')
+            record[col_name] = value
+        records.append(record)
+    _store_cached_list(filepath, records)
+    return records
+
+
+def _update_cell(filepath: str, place_id: str, col_name: str, value):
+    """Sets col_name to value on the row whose Place_ID matches place_id.
+    The caller MUST hold the file lock for filepath."""
+    if _update_cells(filepath, [(place_id, col_name, value)]):
+        raise HTTPException(status_code=404, detail=f"Riga con Place_ID={place_id} non trovata.")
+
+
+# Write-behind for cell updates: rapid toggles/notes on the same list are
+# coalesced. The endpoint records the edit and returns; a timer (or reaching
+# _FLUSH_MAX_PENDING) flushes all pending edits of the file with a single
+# workbook load/save. Anything reading the file flushes it first; edits are
+# only detached under the file lock, so that also waits for a flush already
+# in progress.
+_FLUSH_DELAY_S = 0.25
+_FLUSH_MAX_PENDING = 20
+
+
+class _PendingWrites:
+    def __init__(self):
+        self.edits = {}  # (place_id, col_name) -> value, last write wins
+        self.timer = None
+
+
+_pending_guard = threading.Lock()
+_pending_writes: dict[str, _PendingWrites] = {}
+
+
+def _take_pending_writes(filepath: str):
+    """Detaches and returns the pending edits of filepath, stopping its timer."""
+    with _pending_guard:
+        pending = _pending_writes.pop(os.path.normpath(filepath), None)
+    if pending is not None and pending.timer is not None:
+        pending.timer.cancel()
+    return pending
+
+
+def _flush_pending_writes(filepath: str):
+    """Writes any pending edits of filepath to disk. Returns once they, and
+    any flush of the file already running, are on disk.
+    The caller must NOT hold the file lock for filepath."""
+    with _get_file_lock(filepath):
+        pending = _take_pending_writes(filepath)
+        if not pending or not pending.edits:
+            return
+        missing = _update_cells(
+            filepath,
+            [(pid, col, value) for (pid, col), value in pending.edits.items()]
+        )
+    if missing:
+        # These edits were already acknowledged to the client
+        logger.warning("Scrittura differita: Place_ID non trovati in %s, modifiche scartate: %s", filepath, missing)
+
+
+def _flush_pending_writes_safe(filepath: str):
+    """Timer/atexit entry point: a failed background flush is only logged."""
+    try:
+        _flush_pending_writes(filepath)
+    except Exception:
+        logger.exception("Scrittura differita fallita per %s: modifiche perse", filepath)
+
+
+@atexit.register
+def _flush_all_pending_writes():
+    with _pending_guard:
+        paths = list(_pending_writes)
+    for path in paths:
+        _flush_pending_writes_safe(path)
+
+
+def _queue_cell_update(filepath: str, place_id: str, col_name: str, value):
+    """Records a cell edit to be written by the write-behind flush.
+
+    Place_IDs unknown to the sidecar index are written synchronously instead,
+    so a missing row still surfaces as a 404 to the caller.
+    """
+    if place_id not in _read_place_index(filepath):
+        _flush_pending_writes(filepath)
+        with _get_file_lock(filepath):
+            _update_cell(filepath, place_id, col_name, value)
+        return
+
+    key = os.path.normpath(filepath)
+    with _pending_guard:
+        pending = _pending_writes.setdefault(key, _PendingWrites())
+        pending.edits[(place_id, col_name)] = value
+        flush_now = len(pending.edits) >= _FLUSH_MAX_PENDING
+        if not flush_now and pending.timer is None:
+            pending.timer = threading.Timer(_FLUSH_DELAY_S, _flush_pending_writes_safe, args=(key,))
+            pending.timer.daemon = True
+            pending.timer.start()
+    if flush_now:
+        _flush_pending_writes(key)
 
 
 class UpdateNoteRequest(BaseModel):
@@ -213,27 +762,10 @@ class UpdateNoteRequest(BaseModel):
 @router.put("/{filename}/note")
 def update_note(filename: str, request: UpdateNoteRequest):
     """Updates the Note field for a specific row in the Excel list."""
-    filepath = _safe_filepath(filename)
-
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Lista non trovata")
+    filepath = _existing_filepath(filename)
 
     try:
-        with _get_file_lock(filepath):
-            df = pd.read_excel(filepath)
-
-            if 'Place_ID' not in df.columns:
-                raise HTTPException(status_code=500, detail="Il file non contiene una colonna Place_ID.")
-
-            if 'Note' not in df.columns:
-                df['Note'] = ''
-
-            mask = df['Place_ID'].astype(str) == request.place_id
-            if not mask.any():
-                raise HTTPException(status_code=404, detail=f"Riga con Place_ID={request.place_id} non trovata.")
-
-            df.loc[mask, 'Note'] = request.note
-            _save_preserving_ricerche(filepath, df)
+        _queue_cell_update(filepath, request.place_id, 'Note', request.note)
 
         return {"message": "Nota aggiornata con successo"}
     except HTTPException:
@@ -249,49 +781,55 @@ class UpdateRowRequest(BaseModel):
     action: str # "hide", "call", or "interested"
     value: bool
 
+# Row action -> column it toggles
+_ACTION_COLUMNS = {"hide": "Hide", "call": "Call", "interested": "Interested"}
+
 @router.put("/{filename}/row")
 def update_row(filename: str, request: UpdateRowRequest):
     """Updates a specific row in the Excel list based on Place_ID."""
-    filepath = _safe_filepath(filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Lista non trovata")
+    filepath = _existing_filepath(filename)
         
-    if request.action not in ["hide", "call", "interested"]:
+    if request.action not in _ACTION_COLUMNS:
         raise HTTPException(status_code=400, detail="Azione non valida. Usa 'hide', 'call' o 'interested'.")
         
+    col_name = _ACTION_COLUMNS[request.action]
+
     try:
-        with _get_file_lock(filepath):
-            df = pd.read_excel(filepath)
+        _queue_cell_update(filepath, request.place_id, col_name, request.value)
+
+        return {"message": f"Riga aggiornata con successo! {col_name}={request.value}"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Errore durante l'aggiornamento del file: {str(e)}")
 
-            if 'Place_ID' not in df.columns:
-                raise HTTPException(status_code=500, detail="Il file non contiene una colonna Place_ID.")
 
-            # Ensure columns exist
-            if 'Hide' not in df.columns:
-                df['Hide'] = False
-            if 'Call' not in df.columns:
-                df['Call'] = False
-            if 'Interested' not in df.columns:
-                df['Interested'] = False
+class BatchUpdateRequest(BaseModel):
+    updates: List[UpdateRowRequest] = Field(max_length=1000)
 
-            if request.action == "hide":
-                col_name = "Hide"
-            elif request.action == "call":
-                col_name = "Call"
-            else:
-                col_name = "Interested"
+@router.put("/{filename}/rows")
+def update_rows(filename: str, request: BatchUpdateRequest):
+    """Applies several row toggles with a single read and write of the Excel list.
 
-            # Find the row and update
-            mask = df['Place_ID'].astype(str) == request.place_id
-            if not mask.any():
-                raise HTTPException(status_code=404, detail=f"Riga con Place_ID={request.place_id} non trovata.")
+    Rows whose Place_ID isn't found are skipped and reported in `not_found`.
+    """
+    filepath = _existing_filepath(filename)
 
-            df.loc[mask, col_name] = request.value
+    for update in request.updates:
+        if update.action not in _ACTION_COLUMNS:
+            raise HTTPException(status_code=400, detail="Azione non valida. Usa 'hide', 'call' o 'interested'.")
 
-            _save_preserving_ricerche(filepath, df)
+    try:
+        _flush_pending_writes(filepath)
+        with _get_file_lock(filepath):
+            not_found = _update_cells(filepath, [
+                (u.place_id, _ACTION_COLUMNS[u.action], u.value) for u in request.updates
+            ])
 
-        return {"message": f"Riga aggiornata con successo! {col_name}={request.value}"}
+        updated = len(request.updates) - len(not_found)
+        return {"message": f"{updated} righe aggiornate con successo", "not_found": not_found}
     except HTTPException:
         raise
     except Exception as e:
@@ -303,37 +841,38 @@ def update_row(filename: str, request: UpdateRowRequest):
 @router.get("/{filename}/searches")
 def get_searches(filename: str):
     """Returns the search history from the _ricerche sheet of the Excel list."""
-    filepath = _safe_filepath(filename)
-
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Lista non trovata")
+    filepath = _existing_filepath(filename)
 
     try:
-        df = pd.read_excel(filepath, sheet_name='_ricerche')
-        return df.fillna('').to_dict(orient='records')
+        headers, rows = _read_ricerche(filepath)
+        return [
+            {h: ('' if v is None else v) for h, v in zip(headers, row)}
+            for row in rows
+        ]
     except Exception:
-        return []  # Sheet doesn't exist yet
+        return []
 
 
 @router.get("/{filename}/download")
 def download_list(filename: str):
     """Downloads the Excel file, replacing the Place_ID column with the
     direct Google Business (Maps) link for each lead."""
-    filepath = _safe_filepath(filename)
-
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Lista non trovata")
+    filepath = _existing_filepath(filename)
 
     try:
+        _flush_pending_writes(filepath)
         with _get_file_lock(filepath):
-            df = pd.read_excel(filepath)
+            df = pd.read_excel(filepath, dtype=READ_DTYPES)
 
             # Replace Place_ID with the direct Google listing link.
             if 'Place_ID' in df.columns:
-                df['Place_ID'] = df['Place_ID'].apply(
-                    lambda pid: f"https://www.google.com/maps/place/?q=place_id:{pid}"
-                    if pd.notna(pid) and str(pid).strip() else ''
-                )
+                # Vectorized: Place_ID is already text (READ_DTYPES), so no
+                # per-row str() or Python lambda is needed
+                pids = df['Place_ID']
+                has_id = pids.notna() & (pids.str.strip() != '')
+                df['Place_ID'] = (
+                    "https://www.google.com/maps/place/?q=place_id:" + pids
+                ).where(has_id, '')
                 df = df.rename(columns={'Place_ID': 'Link Google'})
 
             # Build a temporary export file, preserving the _ricerche sheet.
@@ -0,0 +1,62 @@
+import os
+import shelve
+import threading
+import time
+from typing import Optional, Tuple
+
+GEOCACHE_PATH = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "data", "geocache.db"))
+
+# Place coordinates are practically static: refresh them once a month
+GEOCODE_TTL_S = 30 * 24 * 3600
+
+# normalized query -> (lat, lng, cached_at); mirrors the shelve on disk
+_memory_cache: dict = {}
+_cache_lock = threading.Lock()
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+def _read_entry(key: str):
+    with _cache_lock:
+        entry = _memory_cache.get(key)
+        if entry is None:
+            try:
+                with shelve.open(GEOCACHE_PATH) as db:
+                    entry = db.get(key)
+            except Exception:
+                entry = None
+            if entry is not None:
+                _memory_cache[key] = entry
+    return entry
+
+
+def _write_entry(key: str, entry: tuple):
+    with _cache_lock:
+        _memory_cache[key] = entry
+        try:
+            with shelve.open(GEOCACHE_PATH) as db:
+                db[key] = entry
+        except Exception as e:
+            # The cache is an optimization only: keep the in-memory copy
+            print(f"Geocache non scrivibile: {e}")
+
+
+def geocode_cached(gmaps, query: str) -> Optional[Tuple[float, float]]:
+    """
+    Returns the (lat, lng) of query, calling the Geocoding API only if it wasn't
+    resolved in the last GEOCODE_TTL_S seconds. Returns None if the place isn't found
+    (misses are not cached).
+    """
+    key = _normalize(query)
+    entry = _read_entry(key)
+    if entry is not None and time.time() - entry[2] < GEOCODE_TTL_S:
+        return entry[0], entry[1]
+
+    result = gmaps.geocode(query)
+    if not result:
+        return None
+    location = result[0]['geometry']['location']
+    _write_entry(key, (location['lat'], location['lng'], time.time()))
+    return location['lat'], location['lng']
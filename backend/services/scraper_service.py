@@ -1,41 +1,231 @@
 import math
 import re
 import time
-import shutil
-import tempfile
+import heapq
+import itertools
+import threading
 import googlemaps
-import pandas as pd
+import requests
+import httpx
+from requests.adapters import HTTPAdapter
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
 import os
 from datetime import datetime
 from typing import List, Dict, Any, Generator
 from openpyxl import load_workbook
+from services.geocode_cache import geocode_cached
 
 LISTS_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "data", "lists"))
 
+# Nearby searches in flight at once
+MAX_CONCURRENT_REQUESTS = 16
+# Searches submitted to the pool at once: enough to keep every worker busy,
+# while a huge grid never turns into millions of queued futures
+MAX_QUEUED_SEARCHES = 2 * MAX_CONCURRENT_REQUESTS
+# places_nearby calls per second, shared by every scrape running in this process
+# (Places quota is 6000 QPM = 100 QPS per project; stay well below it)
+NEARBY_SEARCH_QPS = 50
+
+# Places API (New) text search: returns phone/website in the same response as the search
+PLACES_V1_SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+PLACES_V1_FIELD_MASK = ",".join([
+    "places.id",
+    "places.displayName",
+    "places.shortFormattedAddress",
+    "places.formattedAddress",
+    "places.nationalPhoneNumber",
+    "places.websiteUri",
+    "places.rating",
+    "places.types",
+    "nextPageToken",
+])
+
+# Minimum spacing between two progress events (the UI needs ~10 Hz at most)
+PROGRESS_MIN_INTERVAL_S = 0.1
+
+# Lists with fewer Place_IDs than this are checked with a plain set
+BLOOM_MIN_ENTRIES = 10_000
+
+
+class _PlaceIdBloom:
+    """Minimal Bloom filter (~10 bits per entry, double hashing) over Place_ID strings."""
+
+    BITS_PER_ENTRY = 10
+    NUM_HASHES = 7
+
+    def __init__(self, expected_entries: int):
+        self.num_bits = max(64, expected_entries * self.BITS_PER_ENTRY)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        h1 = hash(key)
+        h2 = hash((key, 0x9E3779B9)) | 1
+        for i in range(self.NUM_HASHES):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class _ExistingPlaceIds:
+    """
+    Membership test over the Place_IDs already saved in a list.
+
+    Small lists use a plain set of strings. Large lists keep no strings at all: a Bloom
+    filter rejects most scraped places (which are new) on its own, and hits are confirmed
+    against a sorted int64 array of the ids' 64-bit hashes (8 bytes per id instead of
+    ~130 for a str in a set). A hash collision would make a new place look already saved
+    and skip it; at 10M ids the odds are ~1e-6 per run, an accepted trade-off.
+    """
+
+    def __init__(self, place_ids: List[str]):
+        self._count = len(place_ids)
+        self._set = None
+        self._bloom = None
+        self._hashes = None
+        if len(place_ids) < BLOOM_MIN_ENTRIES:
+            self._set = set(place_ids)
+        else:
+            self._bloom = _PlaceIdBloom(len(place_ids))
+            for pid in place_ids:
+                self._bloom.add(pid)
+            self._hashes = np.sort(np.fromiter((hash(pid) for pid in place_ids), dtype=np.int64, count=len(place_ids)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, place_id: str) -> bool:
+        if self._set is not None:
+            return place_id in self._set
+        if place_id not in self._bloom:
+            return False
+        h = hash(place_id)
+        i = int(np.searchsorted(self._hashes, h))
+        return i < len(self._hashes) and int(self._hashes[i]) == h
+
+
+class _RateLimiter:
+    """Thread-safe token bucket: at most `rate` acquisitions per second, in bursts of up to `rate`."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_nearby_rate_limiter = _RateLimiter(NEARBY_SEARCH_QPS)
+
+
+@lru_cache(maxsize=32)
+def _hex_offsets_m(radius_m: int, grid_step_m: int) -> tuple:
+    """
+    Metric (x, y) offsets from the center of the hexagonal lattice covering radius_m.
+    Depends only on the two ints, so it is computed once per (radius, step) pair;
+    the arrays are read-only since they are shared between calls.
+    """
+    col_step_m = grid_step_m * math.sqrt(3)
+    row_step_m = grid_step_m * 1.5
+    # Keep every hexagon that can still touch the disk, not just centers inside it
+    reach_m = radius_m + grid_step_m
+
+    num_rows = math.ceil(reach_m / row_step_m)
+    num_cols = math.ceil(reach_m / col_step_m) + 1
+
+    rows = np.arange(-num_rows, num_rows + 1)
+    cols = np.arange(-num_cols, num_cols + 1)
+    R, C = np.meshgrid(rows, cols, indexing='ij')
+    y_m = R * row_step_m
+    # Odd rows are shifted by half a column
+    x_m = (C + (R % 2) * 0.5) * col_step_m
+    inside = x_m * x_m + y_m * y_m <= reach_m * reach_m
+
+    x_m, y_m = x_m[inside], y_m[inside]
+    x_m.setflags(write=False)
+    y_m.setflags(write=False)
+    return x_m, y_m
+
+
+def _read_place_ids(filepath: str) -> List[str]:
+    """Streams the Place_ID column of the main sheet without loading the rest of the list."""
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        if 'Place_ID' not in header:
+            return []
+        idx = header.index('Place_ID')
+        place_ids = []
+        for row in rows:
+            if idx < len(row) and row[idx] is not None and row[idx] != '':
+                place_ids.append(str(row[idx]))
+        return place_ids
+    finally:
+        wb.close()
+
+
+# Connections are shared by every scrape in the process, so TCP/TLS setup is paid once
+# and stays warm between runs. Pools are sized for the worker threads: the requests
+# default of 10 per host would drop connections with 16 workers.
+_legacy_session = requests.Session()
+_legacy_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENT_REQUESTS * 2))
+
+_http2_client = None
+_http2_client_lock = threading.Lock()
+
+
+def _get_http2_client() -> httpx.Client:
+    """Shared HTTP/2 client for the Places API (New): concurrent searches multiplex on one TLS connection."""
+    global _http2_client
+    with _http2_client_lock:
+        if _http2_client is None:
+            _http2_client = httpx.Client(
+                http2=True,
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=MAX_CONCURRENT_REQUESTS * 2, max_connections=MAX_CONCURRENT_REQUESTS * 4),
+            )
+        return _http2_client
+
+
 class GoogleMapsScraperService:
-    def __init__(self, api_key: str):
-        self.gmaps = googlemaps.Client(key=api_key)
+    def __init__(self, api_key: str, use_places_v1: bool = None):
+        self.gmaps = googlemaps.Client(key=api_key, requests_session=_legacy_session)
+        self.api_key = api_key
+        if use_places_v1 is None:
+            # Opt-in: the legacy Nearby Search stays the default path
+            use_places_v1 = os.getenv("PLACES_API_V1", "").strip().lower() in ("1", "true", "yes")
+        self.use_places_v1 = use_places_v1
+        self.http = _get_http2_client() if use_places_v1 else None
 
     def generate_grid_points(self, center_lat: float, center_lng: float, radius_m: int, grid_step_m: int) -> List[tuple]:
         """
-        Generates a grid of (lat, lng) points covering the given radius.
+        Generates a hexagonal lattice of (lat, lng) points covering the given radius.
+        Each point is the center of a hexagon with circumradius grid_step_m, so searching
+        with radius grid_step_m around every point covers the whole disk.
         """
-        points = []
-        lat_step_deg = grid_step_m / 111320.0
-        num_steps = math.ceil(radius_m / grid_step_m)
-        
-        for i in range(-num_steps, num_steps + 1):
-            for j in range(-num_steps, num_steps + 1):
-                x_offset_m = i * grid_step_m
-                y_offset_m = j * grid_step_m
-                
-                if math.sqrt(x_offset_m**2 + y_offset_m**2) <= radius_m:
-                    point_lat = center_lat + (i * lat_step_deg)
-                    lng_step_deg = grid_step_m / (111320.0 * math.cos(math.radians(point_lat)))
-                    point_lng = center_lng + (j * lng_step_deg)
-                    points.append((point_lat, point_lng))
-                    
-        return points
+        x_m, y_m = _hex_offsets_m(radius_m, grid_step_m)
+        lats = center_lat + y_m / 111320.0
+        lngs = center_lng + x_m / (111320.0 * np.cos(np.radians(lats)))
+        return list(zip(lats.tolist(), lngs.tolist()))
 
     def _parse_coordinates(self, text: str):
         """Rileva se il testo è una coppia lat,lng. Restituisce (lat, lng) o None."""
@@ -47,6 +237,71 @@ class GoogleMapsScraperService:
                 return (lat, lng)
         return None
 
+    def _search_page_v1(self, lat: float, lng: float, radius_m: int, keyword: str, page_token: str = None) -> dict:
+        """
+        One page of Places API (New) text search restricted to the box around (lat, lng, radius_m).
+        Returns it in the legacy places_nearby shape, plus phone/website.
+        """
+        lat_delta = radius_m / 111320.0
+        lng_delta = radius_m / (111320.0 * math.cos(math.radians(lat)))
+        body = {
+            "textQuery": keyword,
+            "pageSize": 20,
+            "locationRestriction": {
+                "rectangle": {
+                    "low": {"latitude": lat - lat_delta, "longitude": lng - lng_delta},
+                    "high": {"latitude": lat + lat_delta, "longitude": lng + lng_delta},
+                }
+            },
+        }
+        if page_token:
+            body["pageToken"] = page_token
+        resp = self.http.post(
+            PLACES_V1_SEARCH_URL,
+            json=body,
+            headers={"X-Goog-Api-Key": self.api_key, "X-Goog-FieldMask": PLACES_V1_FIELD_MASK},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        results = []
+        for place in data.get('places', []):
+            results.append({
+                'place_id': place.get('id'),
+                'name': place.get('displayName', {}).get('text', ''),
+                'vicinity': place.get('shortFormattedAddress') or place.get('formattedAddress', ''),
+                'rating': place.get('rating', ''),
+                'types': place.get('types', []),
+                'phone': place.get('nationalPhoneNumber', ''),
+                'website': place.get('websiteUri', ''),
+            })
+        return {"results": results, "next_page_token": data.get('nextPageToken')}
+
+    def _search_page(self, lat: float, lng: float, radius_m: int, keyword: str, page_token: str = None):
+        """
+        Fetches one page of nearby results for a grid point (retrying once on API errors).
+        Returns (places_result, error_messages); runs inside a worker thread, so it never yields.
+        The 2s wait a legacy next_page_token needs is scheduled by the caller, not slept here.
+        """
+        errors = []
+        for attempt in range(2):
+            try:
+                _nearby_rate_limiter.acquire()
+                if self.use_places_v1:
+                    return self._search_page_v1(lat, lng, radius_m, keyword, page_token), errors
+                if page_token:
+                    return self.gmaps.places_nearby(
+                        location=(lat, lng), radius=radius_m, keyword=keyword, page_token=page_token
+                    ), errors
+                return self.gmaps.places_nearby(
+                    location=(lat, lng), radius=radius_m, keyword=keyword
+                ), errors
+            except Exception as api_err:
+                if attempt == 0:
+                    time.sleep(2)
+                else:
+                    errors.append(f"Errore API punto ({lat:.4f},{lng:.4f}): {api_err}")
+        return {"results": []}, errors
+
     def run_scraping(self, city: str, radius: int, keywords: List[str], list_name: str, grid_step_m: int = 500) -> Generator[Dict[str, Any], None, None]:
         """
         Runs the scraping process, deduplicates against the selected Excel list, and saves results.
@@ -70,13 +325,9 @@ class GoogleMapsScraperService:
             yield {"type": "log", "message": f"Caricamento lista '{filename}' in corso..."}
             
             try:
-                existing_df = pd.read_excel(filepath)
-                # Ensure Place_ID column exists
-                if 'Place_ID' not in existing_df.columns:
-                    existing_df['Place_ID'] = ''
-                
-                # Get set of all existing Place IDs for O(1) lookup
-                already_in_db_place_ids = set(existing_df['Place_ID'].dropna().astype(str))
+                # Only the Place_ID column is needed here: stream it instead of building a DataFrame
+                # Existing Place IDs for O(1) lookup (Bloom-fronted on large lists)
+                already_in_db_place_ids = _ExistingPlaceIds(_read_place_ids(filepath))
                 yield {"type": "log", "message": f"Lista caricata: trovati {len(already_in_db_place_ids)} contatti esistenti."}
             except Exception as e:
                 yield {"type": "error", "message": f"Errore lettura lista: {str(e)}"}
@@ -88,15 +339,15 @@ class GoogleMapsScraperService:
                 yield {"type": "log", "message": f"Coordinate dirette: {center_lat}, {center_lng}"}
             else:
                 yield {"type": "log", "message": f"Geocodifica in corso per: '{city}'"}
-                geocode_result = self.gmaps.geocode(city)
-                if not geocode_result:
+                coords = geocode_cached(self.gmaps, city)
+                if not coords:
                     yield {"type": "error", "message": f"Impossibile trovare le coordinate per '{city}'"}
                     return
-                location = geocode_result[0]['geometry']['location']
-                center_lat, center_lng = location['lat'], location['lng']
+                center_lat, center_lng = coords
                 yield {"type": "log", "message": f"Coordinate trovate: {center_lat}, {center_lng}"}
 
-            search_radius_m = int(grid_step_m * 1.5)
+            # Hexagon circumradius: the smallest search radius that leaves no gaps
+            search_radius_m = grid_step_m
             
             if radius <= search_radius_m:
                 grid_points = [(center_lat, center_lng)]
@@ -108,162 +359,197 @@ class GoogleMapsScraperService:
 
             # seen_place_ids is for this specific extraction run
             seen_place_ids = set()
-            places_data = []
+            # New places as parallel columns (one list per field, same index per place)
+            # rather than one dict per place; place_index maps place_id -> that index
+            place_index = {}
+            pids, kws, names, vicinities, ratings, types_col, phones, websites = [], [], [], [], [], [], [], []
             duplicates_in_run = 0
             duplicates_in_db = 0
             
+            def is_known(place_id):
+                return not place_id or place_id in seen_place_ids or place_id in already_in_db_place_ids
+
             total_grid_steps = len(keywords) * len(grid_points)
             current_grid_step = 0
+            # Progress is coalesced to ~10 updates/s, and only sent when the percentage moves
+            last_progress_emit = 0.0
+            last_progress_pct = -1
             
             yield {"type": "progress", "subtype": "grid", "value": 0, "label": "Ricerca in griglia avviata..."}
 
-            for keyword in keywords:
-                yield {"type": "log", "message": f"--- Inizio estrazione per la keyword: '{keyword}' ---"}
-                
-                for point_idx, (lat, lng) in enumerate(grid_points):
-                    if point_idx % 5 == 0 and point_idx > 0:
-                        yield {"type": "log", "message": f"Avanzamento: punto di ricerca {point_idx}/{len(grid_points)}..."}
-                        
-                    next_page_token = None
-                    pages_fetched = 0
-                    
-                    while pages_fetched < 3:
-                        places_result = {"results": []}
-                        for attempt in range(2):
-                            try:
-                                if next_page_token:
-                                    time.sleep(2)
-                                    places_result = self.gmaps.places_nearby(
-                                        location=(lat, lng), radius=search_radius_m, keyword=keyword, page_token=next_page_token
-                                    )
-                                else:
-                                    places_result = self.gmaps.places_nearby(
-                                        location=(lat, lng), radius=search_radius_m, keyword=keyword
-                                    )
-                                break
-                            except Exception as api_err:
-                                if attempt == 0:
-                                    time.sleep(2)
-                                else:
-                                    yield {"type": "log", "message": f"Errore API punto ({lat:.4f},{lng:.4f}): {api_err}"}
+            # A legacy next_page_token only becomes valid ~2s after it is issued
+            page_token_delay_s = 0 if self.use_places_v1 else 2
+
+            executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+            try:
+                # Every request is one page. Follow-up pages wait in a timer heap rather than
+                # in a sleeping worker, so the pool keeps serving other points meanwhile.
+                # pending: future -> (keyword, lat, lng, pages already fetched for that point)
+                pending = {}
+                # delayed: (ready_at, seq, keyword, lat, lng, page_token, pages already fetched)
+                delayed = []
+                seq = itertools.count()
+
+                # One flat worklist over every (keyword, point): searches of different keywords
+                # overlap too, and the shared rate limiter keeps the pool within the QPS budget.
+                # It is consumed lazily, topping the pool up to MAX_QUEUED_SEARCHES.
+                searches = ((keyword, lat, lng) for keyword in keywords for lat, lng in grid_points)
+                searches_left = True
+                queued_keyword = None
+
+                # Only this thread touches seen_place_ids / the place columns / counters: no lock needed
+                while pending or delayed or searches_left:
+                    now = time.monotonic()
+                    while delayed and delayed[0][0] <= now:
+                        _, _, keyword, lat, lng, page_token, pages_fetched = heapq.heappop(delayed)
+                        future = executor.submit(self._search_page, lat, lng, search_radius_m, keyword, page_token)
+                        pending[future] = (keyword, lat, lng, pages_fetched)
+
+                    while searches_left and len(pending) < MAX_QUEUED_SEARCHES:
+                        search = next(searches, None)
+                        if search is None:
+                            searches_left = False
+                            break
+                        keyword, lat, lng = search
+                        if keyword != queued_keyword:
+                            queued_keyword = keyword
+                            yield {"type": "log", "message": f"--- Accodata estrazione per la keyword: '{keyword}' ({len(grid_points)} punti) ---"}
+                        future = executor.submit(self._search_page, lat, lng, search_radius_m, keyword)
+                        pending[future] = (keyword, lat, lng, 0)
+
+                    timeout = max(0.0, delayed[0][0] - now) if delayed else None
+                    if not pending:
+                        if delayed:
+                            time.sleep(timeout)
+                        continue
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        keyword, lat, lng, pages_fetched = pending.pop(future)
+                        places_result, errors = future.result()
+                        pages_fetched += 1
+                        for message in errors:
+                            yield {"type": "log", "message": message}
 
                         results = places_result.get('results', [])
-                        
-                        for place in results:
-                            place_id = place.get('place_id')
-                            # Check if valid AND not seen in this run AND not already in the Excel DB
-                            if place_id:
-                                if place_id in seen_place_ids:
-                                    duplicates_in_run += 1
-                                else:
-                                    seen_place_ids.add(place_id)
-                                    if place_id in already_in_db_place_ids:
-                                        duplicates_in_db += 1
-                                    else:
-                                        places_data.append({
-                                            'place_id': place_id,
-                                            'keyword_source': keyword,
-                                            'name': place.get('name', ''),
-                                            'vicinity': place.get('vicinity', ''),
-                                            'rating': place.get('rating', ''),
-                                            'types': place.get('types', []),
-                                        })
-                                
                         next_page_token = places_result.get('next_page_token')
-                        pages_fetched += 1
-                        if not next_page_token:
-                            break
-                            
-                    current_grid_step += 1
-                    progress_pct = int((current_grid_step / total_grid_steps) * 100)
-                    yield {"type": "progress", "subtype": "grid", "value": progress_pct, "label": f"Ricerca area ({current_grid_step}/{total_grid_steps}) - '{keyword}'"}
+                        if next_page_token and pages_fetched == 1 and results:
+                            # A dense area already covered: later pages are unlikely to add new places
+                            new_count = sum(1 for place in results if not is_known(place.get('place_id')))
+                            if new_count / len(results) < 0.1:
+                                next_page_token = None
+                        if next_page_token and pages_fetched < 3:
+                            heapq.heappush(delayed, (
+                                time.monotonic() + page_token_delay_s, next(seq),
+                                keyword, lat, lng, next_page_token, pages_fetched
+                            ))
+
+                        # Partition the page with set operations instead of branching per result:
+                        # seen in this run / already in the Excel DB / genuinely new
+                        valid = [place for place in results if place.get('place_id')]
+                        results_by_id = {}
+                        for place in valid:
+                            results_by_id.setdefault(place['place_id'], place)
+                        page_ids = results_by_id.keys()
+
+                        for place_id in page_ids & place_index.keys():
+                            keywords_matched = kws[place_index[place_id]]
+                            if keyword not in keywords_matched:
+                                keywords_matched.append(keyword)
 
-            yield {"type": "log", "message": f"Ricerca griglia completata. Trovate {len(places_data)} NUOVE attività da estrarre (ignorati {duplicates_in_run} duplicati in griglia e {duplicates_in_db} già nel DB)."}
-            if len(places_data) == 0:
+                        new_ids = page_ids - seen_place_ids
+                        seen_place_ids |= new_ids
+                        duplicates_in_run += len(valid) - len(new_ids)
+                        in_db = {place_id for place_id in new_ids if place_id in already_in_db_place_ids}
+                        duplicates_in_db += len(in_db)
+                        to_add = new_ids - in_db
+
+                        # Walk the page in order so rows keep the API's ranking
+                        for place_id, place in results_by_id.items():
+                            if place_id in to_add:
+                                place_index[place_id] = len(pids)
+                                pids.append(place_id)
+                                kws.append([keyword])
+                                names.append(place.get('name', ''))
+                                vicinities.append(place.get('vicinity', ''))
+                                ratings.append(place.get('rating', ''))
+                                types_col.append(", ".join(place.get('types', [])))
+                                # Only filled by the Places API (New) path
+                                phones.append(place.get('phone', ''))
+                                websites.append(place.get('website', ''))
+
+                        if next_page_token and pages_fetched < 3:
+                            continue  # the point is done only after its last page
+
+                        current_grid_step += 1
+                        if current_grid_step % 5 == 0 and current_grid_step < total_grid_steps:
+                            yield {"type": "log", "message": f"Avanzamento: punto di ricerca {current_grid_step}/{total_grid_steps}..."}
+
+                        progress_pct = int((current_grid_step / total_grid_steps) * 100)
+                        now = time.monotonic()
+                        if progress_pct != last_progress_pct and (
+                            now - last_progress_emit >= PROGRESS_MIN_INTERVAL_S or current_grid_step == total_grid_steps
+                        ):
+                            last_progress_emit = now
+                            last_progress_pct = progress_pct
+                            yield {"type": "progress", "subtype": "grid", "value": progress_pct, "label": f"Ricerca area ({current_grid_step}/{total_grid_steps}) - '{keyword}'"}
+            finally:
+                # If the client disconnects mid-run, drop queued searches instead of waiting on them
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            yield {"type": "log", "message": f"Ricerca griglia completata. Trovate {len(pids)} NUOVE attività da estrarre (ignorati {duplicates_in_run} duplicati in griglia e {duplicates_in_db} già nel DB)."}
+            if not pids:
                 yield {"type": "log", "message": "Nessuna nuova attività trovata. Nessun aggiornamento necessario."}
-                yield {"type": "done", "data": existing_df.fillna('').to_dict(orient='records')}
+                from routers.lists import _load_list
+                # Nothing to merge: the row count lets the client check it is in sync
+                yield {"type": "delta", "data": [], "total": len(_load_list(filepath))}
                 return
             
-            extraction_time = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-            final_results = []
-            for p_data in places_data:
-                final_results.append({
-                    'Place_ID': p_data['place_id'],
-                    'Nome': p_data['name'],
-                    'Indirizzo': p_data['vicinity'],
-                    'Telefono': '',
-                    'Sito Web': '',
-                    'Rating': p_data['rating'],
-                    'Categorie': ", ".join(p_data['types']),
-                    'Keyword Ricerca': p_data['keyword_source'],
-                    'Data Estrazione': extraction_time,
-                    'Hide': False,
-                    'Call': False
-                })
-                    
+            # One clock read per run: every new row and the _ricerche entry share it
+            extraction_dt = datetime.now()
+            extraction_time = extraction_dt.strftime("%d/%m/%Y %H:%M:%S")
+            num_new = len(pids)
+            # Column-oriented: the collected lists are the output columns, zipped into rows only when written
+            new_columns = {
+                'Place_ID': pids,
+                'Nome': names,
+                'Indirizzo': vicinities,
+                'Telefono': phones,
+                'Sito Web': websites,
+                'Rating': ratings,
+                'Categorie': types_col,
+                # Searches complete out of order: list the keywords in the order they were given
+                'Keyword Ricerca': [", ".join(k for k in keywords if k in matched) for matched in kws],
+                'Data Estrazione': [extraction_time] * num_new,
+                'Hide': [False] * num_new,
+                'Call': [False] * num_new,
+            }
+
             yield {"type": "log", "message": f"Estrazione dettagli completata. Salvataggio in '{filename}'..."}
 
             # Import the shared file lock
-            from routers.lists import _get_file_lock
+            from routers.lists import _get_file_lock, _flush_pending_writes, _append_rows
+
+            # Land any queued row/note edits before touching the file
+            _flush_pending_writes(filepath)
 
             # Perform all file I/O inside a single lock acquisition.
             # No yield statements inside the lock to avoid holding it while suspended.
             save_error = None
-            updated_df = None
+            updated_records = None
 
             with _get_file_lock(filepath):
                 try:
-                    # Re-read existing data under lock to avoid lost updates
-                    existing_df = pd.read_excel(filepath)
-                    if 'Place_ID' not in existing_df.columns:
-                        existing_df['Place_ID'] = ''
-
-                    # Backup existing _ricerche sheet
-                    searches_rows = []
-                    searches_headers = ['Data', 'Lat', 'Lng', 'Raggio', 'Grid Step', 'Keywords']
-                    try:
-                        searches_df = pd.read_excel(filepath, sheet_name='_ricerche')
-                        searches_headers = searches_df.columns.tolist()
-                        searches_rows = searches_df.values.tolist()
-                    except Exception:
-                        pass  # Sheet doesn't exist yet
-
-                    # Append new data to the existing dataframe
-                    new_df = pd.DataFrame(final_results)
-                    updated_df = pd.concat([existing_df, new_df], ignore_index=True)
-
-                    # Atomic write: write to temp file, then replace original
-                    dir_name = os.path.dirname(filepath)
-                    fd, tmp_path = tempfile.mkstemp(suffix='.xlsx', dir=dir_name)
-                    os.close(fd)
-
-                    try:
-                        # Write main data to temp file
-                        updated_df.to_excel(tmp_path, index=False, engine='openpyxl')
-
-                        # Add _ricerche sheet to temp file
-                        wb = load_workbook(tmp_path)
-                        ws = wb.create_sheet('_ricerche')
-                        ws.append(searches_headers)
-                        for row in searches_rows:
-                            ws.append(row)
-                        ws.append([
-                            datetime.now().strftime("%d/%m/%Y %H:%M"),
-                            center_lat,
-                            center_lng,
-                            radius,
-                            grid_step_m,
-                            ', '.join(keywords)
-                        ])
-                        wb.save(tmp_path)
-
-                        # Atomic replace
-                        shutil.move(tmp_path, filepath)
-                    except Exception:
-                        if os.path.exists(tmp_path):
-                            os.remove(tmp_path)
-                        raise
-
+                    # Append only the new rows and the search entry; the existing
+                    # rows are never re-read into pandas nor re-serialized by us
+                    updated_records = _append_rows(filepath, list(new_columns), zip(*new_columns.values()), [
+                        extraction_dt.strftime("%d/%m/%Y %H:%M"),
+                        center_lat,
+                        center_lng,
+                        radius,
+                        grid_step_m,
+                        ', '.join(keywords)
+                    ])
                 except Exception as e:
                     save_error = str(e)
 
@@ -271,9 +557,10 @@ class GoogleMapsScraperService:
             if save_error:
                 yield {"type": "error", "message": f"ERRORE salvataggio file Excel: {save_error}"}
             else:
-                yield {"type": "log", "message": f"SUCCESSO: Aggiunti {len(final_results)} nuovi lead alla lista."}
-                # Return the updated full list to the frontend
-                yield {"type": "done", "data": updated_df.fillna('').to_dict(orient='records')}
+                yield {"type": "log", "message": f"SUCCESSO: Aggiunti {num_new} nuovi lead alla lista."}
+                # Send only the appended rows (as the list endpoint would return them) plus
+                # the new row count; the client merges them into the list it already shows
+                yield {"type": "delta", "data": updated_records[-num_new:], "total": len(updated_records)}
 
         except Exception as e:
             yield {"type": "error", "message": f"ERRORE CRITICO: {str(e)}"}
@@ -55,6 +55,11 @@ function keywordColor(keyword) {
   return KEYWORD_COLORS[Math.abs(hash) % KEYWORD_COLORS.length];
 }
 
+// 'Keyword Ricerca' lists every keyword that found the place, e.g. "pizza, bar"
+function splitKeywords(value) {
+  return String(value || '').split(',').map(k => k.trim()).filter(k => k);
+}
+
 const MAX_GRID_POINTS = 2000;
 
 function generateGridPoints(centerLat, centerLng, radiusM, gridStepM) {
@@ -63,15 +68,20 @@ function generateGridPoints(centerLat, centerLng, radiusM, gridStepM) {
   // Stima preventiva: se i punti sarebbero troppi, non calcolare
   const numSteps = Math.ceil(radiusM / gridStepM);
   if (numSteps > 70) return points; // (2*70+1)^2 ≈ 20000, troppi
-  const latStepDeg = gridStepM / 111320.0;
-  for (let i = -numSteps; i <= numSteps; i++) {
-    for (let j = -numSteps; j <= numSteps; j++) {
-      const xOff = i * gridStepM;
-      const yOff = j * gridStepM;
-      if (Math.sqrt(xOff * xOff + yOff * yOff) <= radiusM) {
-        const lat = centerLat + (i * latStepDeg);
-        const lngStep = gridStepM / (111320.0 * Math.cos(lat * Math.PI / 180));
-        const lng = centerLng + (j * lngStep);
+  // Reticolo esagonale: stesso schema di generate_grid_points nel backend
+  const colStepM = gridStepM * Math.sqrt(3);
+  const rowStepM = gridStepM * 1.5;
+  const reachM = radiusM + gridStepM;
+  const numRows = Math.ceil(reachM / rowStepM);
+  const numCols = Math.ceil(reachM / colStepM) + 1;
+  for (let r = -numRows; r <= numRows; r++) {
+    const yOff = r * rowStepM;
+    const shift = Math.abs(r) % 2 === 1 ? 0.5 : 0;
+    for (let c = -numCols; c <= numCols; c++) {
+      const xOff = (c + shift) * colStepM;
+      if (xOff * xOff + yOff * yOff <= reachM * reachM) {
+        const lat = centerLat + yOff / 111320.0;
+        const lng = centerLng + xOff / (111320.0 * Math.cos(lat * Math.PI / 180));
         points.push([lat, lng]);
         if (points.length >= MAX_GRID_POINTS) return points;
       }
@@ -116,6 +126,11 @@ function App() {
   const filterDropdownRef = useRef(null);
   const kwContainerRef = useRef(null);
   const scrapeControllerRef = useRef(null);
+  const pendingTogglesRef = useRef({ list: null, items: [] });
+  const toggleTimerRef = useRef(null);
+  // Lista selezionata al momento, letta dai callback asincroni (stream di scraping, fetch)
+  const selectedListRef = useRef(selectedList);
+  selectedListRef.current = selectedList;
   const [showKwSuggestions, setShowKwSuggestions] = useState(false);
 
   // Debounce radius e gridStep per evitare ricalcoli ad ogni keystroke
@@ -191,6 +206,8 @@ function App() {
       const resp = await fetch(`/api/lists/${encodeURIComponent(filename)}`);
       if (resp.ok) {
         const data = await resp.json();
+        // Nel frattempo l'utente può aver selezionato un'altra lista
+        if (selectedListRef.current !== filename) return;
         setResults(data.data || []);
       }
     } catch (e) {
@@ -328,54 +345,70 @@ function App() {
     }
   };
 
-  const toggleRowAction = async (placeId, action, currentValue) => {
-    if (!selectedList || !placeId) return;
-
-    const newValue = !currentValue;
-
-    // Optimistically update the UI to feel snappy
+  const setRowFlag = (placeId, action, value) => {
+    const colName = action === 'hide' ? 'Hide' : action === 'call' ? 'Call' : 'Interested';
     setResults(prevResults =>
-      prevResults.map(r => {
-        if (r.Place_ID !== placeId) return r;
-        const colName = action === 'hide' ? 'Hide' : action === 'call' ? 'Call' : 'Interested';
-        return { ...r, [colName]: newValue };
-      })
+      prevResults.map(r => (r.Place_ID === placeId ? { ...r, [colName]: value } : r))
     );
+  };
+
+  // Rapid clicks are coalesced: toggles queue up for a short window and are
+  // sent together to PUT /rows, which the backend writes with a single save.
+  const flushRowToggles = async () => {
+    clearTimeout(toggleTimerRef.current);
+    toggleTimerRef.current = null;
+    const { list, items } = pendingTogglesRef.current;
+    pendingTogglesRef.current = { list: null, items: [] };
+    if (!list || items.length === 0) return;
+
+    // Undo newest first so each flag ends at its value before the batch
+    const revert = (toRevert) => {
+      [...toRevert].reverse().forEach(t => setRowFlag(t.placeId, t.action, t.previous));
+    };
 
     try {
-      const resp = await fetch(`/api/lists/${encodeURIComponent(selectedList)}/row`, {
+      const resp = await fetch(`/api/lists/${encodeURIComponent(list)}/rows`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
-          place_id: placeId,
-          action: action,
-          value: newValue
+          updates: items.map(t => ({ place_id: t.placeId, action: t.action, value: t.value }))
         })
       });
 
       if (!resp.ok) {
         const errorData = await resp.json();
-        console.error("Failed to update row", errorData);
-        // Revert on error
-        setResults(prevResults =>
-          prevResults.map(r => {
-            if (r.Place_ID !== placeId) return r;
-            const colName = action === 'hide' ? 'Hide' : action === 'call' ? 'Call' : 'Interested';
-            return { ...r, [colName]: currentValue };
-          })
-        );
+        console.error("Failed to update rows", errorData);
+        revert(items);
+        return;
+      }
+      const data = await resp.json();
+      if (data.not_found && data.not_found.length > 0) {
+        console.error("Rows not found", data.not_found);
+        revert(items.filter(t => data.not_found.includes(t.placeId)));
       }
     } catch (e) {
-      console.error("Network error updating row", e);
-      // Revert on error
-      setResults(prevResults =>
-        prevResults.map(r => {
-          if (r.Place_ID !== placeId) return r;
-          const colName = action === 'hide' ? 'Hide' : action === 'call' ? 'Call' : 'Interested';
-          return { ...r, [colName]: currentValue };
-        })
-      );
+      console.error("Network error updating rows", e);
+      revert(items);
+    }
+  };
+
+  const toggleRowAction = (placeId, action, currentValue) => {
+    if (!selectedList || !placeId) return;
+
+    const newValue = !currentValue;
+
+    // Optimistically update the UI to feel snappy
+    setRowFlag(placeId, action, newValue);
+
+    // Never mix toggles of two different lists in one batch
+    if (pendingTogglesRef.current.list && pendingTogglesRef.current.list !== selectedList) {
+      flushRowToggles();
     }
+    pendingTogglesRef.current.list = selectedList;
+    pendingTogglesRef.current.items.push({ placeId, action, value: newValue, previous: currentValue });
+
+    clearTimeout(toggleTimerRef.current);
+    toggleTimerRef.current = setTimeout(flushRowToggles, 150);
   };
 
   const handleSort = (field) => {
@@ -421,6 +454,8 @@ function App() {
     }
     const controller = new AbortController();
     scrapeControllerRef.current = controller;
+    // La lista può essere cambiata durante l'estrazione: le righe nuove appartengono a questa
+    const scrapedList = selectedList;
 
     setIsScraping(true);
     setProgress({ value: 0, label: 'Inizializzazione request...', subtype: '' });
@@ -441,7 +476,7 @@ function App() {
           radius: parseInt(radius),
           grid_step: parseInt(gridStep) || 500,
           keywords: keywords.split(',').map((k) => k.trim()).filter(k => k),
-          list_name: selectedList
+          list_name: scrapedList
         }),
       });
 
@@ -482,13 +517,29 @@ function App() {
                       setLogs((prev) => [...prev, `${new Date().toLocaleTimeString()} - ${parsed.message}`]);
                     } else if (parsed.type === "progress") {
                       setProgress({ value: parsed.value, label: parsed.label, subtype: parsed.subtype });
-                    } else if (parsed.type === "done") {
+                    } else if (parsed.type === "delta") {
                       receivedDone = true;
-                      setResults(parsed.data);
+                      // Se nel frattempo è stata selezionata un'altra lista non c'è nulla da unire:
+                      // riselezionandola verrà ricaricata per intero
+                      if (selectedListRef.current === scrapedList) {
+                        // Il server invia solo le righe nuove: se il conteggio non torna
+                        // (lista cambiata nel frattempo) si ricarica la lista completa
+                        let reloadRequested = false;
+                        setResults(prev => {
+                          if (prev.length + parsed.data.length === parsed.total) {
+                            return parsed.data.length > 0 ? [...prev, ...parsed.data] : prev;
+                          }
+                          if (!reloadRequested) {
+                            reloadRequested = true;
+                            fetchListData(scrapedList);
+                          }
+                          return prev;
+                        });
+                        fetchSearchHistory(scrapedList);
+                      }
                       setIsScraping(false);
                       setProgress({ value: 100, label: 'Completato!', subtype: 'done' });
                       setPreviewCenter(null);
-                      fetchSearchHistory(selectedList);
                     }
                   } catch (err) {
                     console.error("Parse Error:", err, dataStr);
@@ -499,7 +550,7 @@ function App() {
           }
         }
       } finally {
-        // F2: Se lo stream chiude senza evento "done", sblocca la UI
+        // F2: Se lo stream chiude senza evento "delta", sblocca la UI
         if (!receivedDone) {
           setIsScraping(false);
           setProgress((prev) => prev.subtype !== 'done'
@@ -564,7 +615,7 @@ function App() {
   };
 
   // Extract unique keywords for the filter dropdown
-  const uniqueKeywords = [...new Set(results.map(r => r['Keyword Ricerca']).filter(k => k))].sort();
+  const uniqueKeywords = [...new Set(results.flatMap(r => splitKeywords(r['Keyword Ricerca'])))].sort();
 
   const displayedResults = [...results]
     .filter(r => (showHidden ? r.Hide : !r.Hide))
@@ -585,7 +636,7 @@ function App() {
       return true;
     })
     .filter(r => {
-      if (ricercaFilter.size > 0) return ricercaFilter.has(r['Keyword Ricerca']);
+      if (ricercaFilter.size > 0) return splitKeywords(r['Keyword Ricerca']).some(k => ricercaFilter.has(k));
       return true;
     })
     .sort((a, b) => {
@@ -744,7 +795,7 @@ function App() {
                   const pool = new Set();
                   uniqueKeywords.forEach(k => pool.add(k));
                   pastSearches.forEach(s => {
-                    if (s.Keywords) s.Keywords.split(',').map(k => k.trim()).filter(k => k).forEach(k => pool.add(k));
+                    splitKeywords(s.Keywords).forEach(k => pool.add(k));
                   });
                   if (pool.size === 0 || !showKwSuggestions) return null;
 
@@ -1417,20 +1468,25 @@ function App() {
                         {r['Data Estrazione'] || '-'}
                       </td>
                       <td className="px-6 py-4 text-xs text-center">
-                        {r['Keyword Ricerca'] ? (() => {
-                          const kColor = keywordColor(r['Keyword Ricerca']);
-                          return (
-                            <span
-                              style={r.Call
-                                ? { background: `${kColor}18`, border: `1px solid ${kColor}40`, color: `${kColor}80` }
-                                : { background: `${kColor}22`, border: `1px solid ${kColor}60`, color: kColor }
-                              }
-                              className="py-1 px-2 rounded font-medium"
-                            >
-                              {r['Keyword Ricerca']}
-                            </span>
-                          );
-                        })() : <span className="text-slate-500">-</span>}
+                        {r['Keyword Ricerca'] ? (
+                          <div className="flex flex-wrap justify-center gap-1">
+                            {splitKeywords(r['Keyword Ricerca']).map((kw, idx) => {
+                              const kColor = keywordColor(kw);
+                              return (
+                                <span
+                                  key={idx}
+                                  style={r.Call
+                                    ? { background: `${kColor}18`, border: `1px solid ${kColor}40`, color: `${kColor}80` }
+                                    : { background: `${kColor}22`, border: `1px solid ${kColor}60`, color: kColor }
+                                  }
+                                  className="py-1 px-2 rounded font-medium"
+                                >
+                                  {kw}
+                                </span>
+                              );
+                            })}
+                          </div>
+                        ) : <span className="text-slate-500">-</span>}
                       </td>
                       <td className="px-3 py-2">
                         <textarea